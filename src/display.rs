@@ -1,17 +1,27 @@
 use crate::types::{DuplicateGroup, FileCategory, FileEntry};
 use comfy_table::presets::UTF8_FULL;
 use comfy_table::Table;
+use std::borrow::Cow;
+use std::collections::HashMap;
 use std::path::Path;
 
+// Maximum number of file names listed per category in the summary table
+const PREVIEW_LIMIT: usize = 20;
+
 pub struct DisplayFormatter;
 
 impl DisplayFormatter {
+    // Only the root folder is scanned, so a file's path relative to it is just its name.
+    // Taking the last component avoids the per-file component walk of strip_prefix.
+    fn relative_name(path: &Path) -> Cow<'_, str> {
+        path.file_name().unwrap_or(path.as_os_str()).to_string_lossy()
+    }
+
     pub fn display_summary(
         entries: &[FileEntry],
         duplicates: &[DuplicateGroup],
         actions: &[String],
         dry_run: bool,
-        folder_path: &Path,
     ) {
         if dry_run {
             println!("\n[*] Analysis Mode (No files will be moved)");
@@ -22,24 +32,23 @@ impl DisplayFormatter {
         table.load_preset(UTF8_FULL);
         table.set_header(vec!["Category", "Count", "Files"]);
 
-        for category in FileCategory::order() {
-            let files: Vec<_> = entries
-                .iter()
-                .filter(|e| e.category == category)
-                .collect();
+        // Bucket entries in one pass instead of rescanning them for every category
+        let mut by_category: HashMap<&FileCategory, Vec<&FileEntry>> = HashMap::new();
+        for entry in entries {
+            by_category.entry(&entry.category).or_default().push(entry);
+        }
 
-            if !files.is_empty() {
-                let file_list = files
+        for category in FileCategory::order() {
+            if let Some(files) = by_category.get(&category) {
+                let mut file_list = files
                     .iter()
-                    .map(|f| {
-                        f.path
-                            .strip_prefix(folder_path)
-                            .unwrap_or(&f.path)
-                            .display()
-                            .to_string()
-                    })
+                    .take(PREVIEW_LIMIT)
+                    .map(|f| Self::relative_name(&f.path))
                     .collect::<Vec<_>>()
                     .join("\n");
+                if files.len() > PREVIEW_LIMIT {
+                    file_list.push_str(&format!("\n… and {} more", files.len() - PREVIEW_LIMIT));
+                }
 
                 table.add_row(vec![
                     category.as_str(),
@@ -57,13 +66,7 @@ impl DisplayFormatter {
             for dup_group in duplicates {
                 println!("[!] Group {}: {} files", &dup_group.checksum_key[..8], dup_group.files.len());
                 for file in &dup_group.files {
-                    println!(
-                        "[!]   - {}",
-                        file.path
-                            .strip_prefix(folder_path)
-                            .unwrap_or(&file.path)
-                            .display()
-                    );
+                    println!("[!]   - {}", Self::relative_name(&file.path));
                 }
             }
         }
@@ -1,11 +1,19 @@
 use crate::types::{DuplicateGroup, FileEntry};
 use anyhow::Result;
-use md5;
-use sha2::{Digest, Sha256};
-use std::collections::HashMap;
+use memmap2::Mmap;
 use std::fs::File;
-use std::io::Read;
+use std::io::{self, Read};
 use std::path::Path;
+use std::sync::atomic::{AtomicUsize, Ordering};
+use std::thread;
+use xxhash_rust::xxh3::{xxh3_128, Xxh3};
+
+/// Number of leading bytes hashed to split same-size files before a full read
+const HEAD_BYTES: u64 = 4096;
+/// Files up to this size are read and hashed in a single call instead of streamed
+const ONE_SHOT_BYTES: u64 = 1 << 20;
+/// Read size used when streaming larger files that could not be memory-mapped
+const STREAM_BUFFER_BYTES: usize = 128 * 1024;
 
 pub struct DuplicateFinder {
     verbose: bool,
@@ -16,31 +24,81 @@ impl DuplicateFinder {
         Self { verbose }
     }
 
-    fn calculate_checksums(file_path: &Path) -> Result<(String, String)> {
+    fn calculate_fingerprint(file_path: &Path) -> Result<u128> {
         let mut file = File::open(file_path)?;
-        let mut buffer = [0; 8192];
-        let mut md5_hash = md5::Context::new();
-        let mut sha256_hash = Sha256::new();
+        let size = file.metadata()?.len();
+
+        if size <= ONE_SHOT_BYTES {
+            let mut contents = Vec::with_capacity(size as usize);
+            file.read_to_end(&mut contents)?;
+            return Ok(xxh3_128(&contents));
+        }
+
+        // Larger files are mapped so the hasher reads the page cache directly
+        // instead of copying every chunk into a user-space buffer.
+        // SAFETY: the mapping is read-only and dropped before returning. Another
+        // process truncating the file mid-hash can still fault, as with any mmap reader.
+        if let Ok(map) = unsafe { Mmap::map(&file) } {
+            return Ok(xxh3_128(&map));
+        }
+
+        let mut buffer = vec![0; STREAM_BUFFER_BYTES];
+        let mut hasher = Xxh3::new();
 
         loop {
             let bytes_read = file.read(&mut buffer)?;
             if bytes_read == 0 {
                 break;
             }
-            md5_hash.consume(&buffer[..bytes_read]);
-            sha256_hash.update(&buffer[..bytes_read]);
+            hasher.update(&buffer[..bytes_read]);
         }
 
-        let md5_digest = format!("{:x}", md5_hash.compute());
-        let sha256_digest = format!("{:x}", sha256_hash.finalize());
+        Ok(hasher.digest128())
+    }
 
-        Ok((md5_digest, sha256_digest))
+    fn calculate_head_fingerprint(file_path: &Path, size: u64) -> Result<u128> {
+        // The size is already known, so one exact read fetches the whole head
+        let mut file = File::open(file_path)?;
+        let mut buffer = [0; HEAD_BYTES as usize + 1];
+        let len = size.min(HEAD_BYTES) as usize;
+        file.read_exact(&mut buffer[..len])?;
+
+        // A file no larger than the head is fingerprinted in full here, so it must not
+        // hold more data than the size recorded during analysis
+        if size <= HEAD_BYTES && file.read(&mut buffer[len..])? != 0 {
+            return Err(io::Error::new(
+                io::ErrorKind::InvalidData,
+                "file is larger than its recorded size",
+            )
+            .into());
+        }
+
+        Ok(xxh3_128(&buffer[..len]))
     }
 
     fn get_file_size(file_path: &Path) -> Result<u64> {
         Ok(std::fs::metadata(file_path)?.len())
     }
 
+    fn compare_contents(file1: &Path, file2: &Path) -> Result<bool> {
+        let mut f1 = File::open(file1)?;
+        let mut f2 = File::open(file2)?;
+        let mut buffer1 = vec![0; STREAM_BUFFER_BYTES];
+        let mut buffer2 = vec![0; STREAM_BUFFER_BYTES];
+
+        loop {
+            let bytes_read = f1.read(&mut buffer1)?;
+            if bytes_read == 0 {
+                // Sizes already matched, so the other file must be exhausted too
+                return Ok(f2.read(&mut buffer2[..1])? == 0);
+            }
+            f2.read_exact(&mut buffer2[..bytes_read])?;
+            if buffer1[..bytes_read] != buffer2[..bytes_read] {
+                return Ok(false);
+            }
+        }
+    }
+
     pub fn are_files_identical(file1: &Path, file2: &Path) -> Result<bool> {
         // First compare sizes (fast)
         let size1 = Self::get_file_size(file1)?;
@@ -50,11 +108,8 @@ impl DuplicateFinder {
             return Ok(false);
         }
 
-        // Then compare checksums (thorough)
-        let checksums1 = Self::calculate_checksums(file1)?;
-        let checksums2 = Self::calculate_checksums(file2)?;
-
-        Ok(checksums1 == checksums2)
+        // Then compare contents byte by byte, stopping at the first difference
+        Self::compare_contents(file1, file2)
     }
 
     pub fn find_duplicates(&self, entries: &[FileEntry]) -> Result<Vec<DuplicateGroup>> {
@@ -62,74 +117,141 @@ impl DuplicateFinder {
             println!("\n[*] Checking for duplicates...");
         }
 
-        let mut file_checksums: HashMap<String, Vec<FileEntry>> = HashMap::new();
-
-        // First pass: collect all files and their checksums
-        for entry in entries {
-            match Self::calculate_checksums(&entry.path) {
-                Ok((md5, sha256)) => {
-                    let checksum_key = format!("{}_{}", md5, sha256);
-                    file_checksums
-                        .entry(checksum_key)
-                        .or_insert_with(Vec::new)
-                        .push(entry.clone());
-                }
-                Err(e) => {
-                    if self.verbose {
-                        eprintln!(
-                            "[-] Error reading file {}: {}",
-                            entry.path.display(),
-                            e
-                        );
-                    }
+        // First pass: sort (size, entry) pairs and keep runs of equal size, a file with
+        // a unique size cannot have a duplicate. Sizes were recorded during analysis,
+        // and sorting one flat vector avoids building a map of per-size vectors.
+        let mut by_size: Vec<(u64, &FileEntry)> = entries.iter().map(|e| (e.size, e)).collect();
+        by_size.sort_unstable_by_key(|(size, _)| *size);
+
+        // Second pass: split same-size groups by a fingerprint of the first few KB
+        let candidates: Vec<&FileEntry> = by_size
+            .chunk_by(|(a, _), (b, _)| a == b)
+            .filter(|run| run.len() > 1)
+            .flatten()
+            .map(|(_, entry)| *entry)
+            .collect();
+        let heads = parallel_map(&candidates, |entry| {
+            Self::calculate_head_fingerprint(&entry.path, entry.size)
+        });
+
+        let mut by_head: Vec<(u64, u128, &FileEntry)> = Vec::with_capacity(candidates.len());
+        for (entry, head) in candidates.into_iter().zip(heads) {
+            match head {
+                Ok(head) => by_head.push((entry.size, head, entry)),
+                Err(e) => self.report_read_error(entry, &e),
+            }
+        }
+        by_head.sort_unstable_by_key(|(size, head, _)| (*size, *head));
+
+        // Third pass: full fingerprint only for files that survived both filters. A file
+        // no larger than the head was hashed in full already, so its head is final.
+        let mut by_fingerprint: Vec<(u64, u128, &FileEntry)> = Vec::new();
+        let mut candidates: Vec<&FileEntry> = Vec::new();
+        for run in by_head.chunk_by(|a, b| (a.0, a.1) == (b.0, b.1)) {
+            if run.len() < 2 {
+                continue;
+            }
+            for &(size, head, entry) in run {
+                if size <= HEAD_BYTES {
+                    by_fingerprint.push((size, head, entry));
+                } else {
+                    candidates.push(entry);
                 }
             }
         }
+        let fingerprints = parallel_map(&candidates, |entry| Self::calculate_fingerprint(&entry.path));
 
-        // Second pass: identify duplicates
-        let mut duplicates = Vec::new();
+        for (entry, fingerprint) in candidates.into_iter().zip(fingerprints) {
+            match fingerprint {
+                Ok(fingerprint) => by_fingerprint.push((entry.size, fingerprint, entry)),
+                Err(e) => self.report_read_error(entry, &e),
+            }
+        }
 
-        for (checksum_key, file_entries) in file_checksums {
-            if file_entries.len() > 1 {
-                // Verify files are actually identical
-                let base_file = &file_entries[0];
-                let mut identical_files = vec![base_file.clone()];
+        // Identify duplicates: matching size and 128-bit fingerprint is trusted as identical.
+        // Sorting by creation time within the same key puts the oldest copy first in each run.
+        by_fingerprint.sort_unstable_by_key(|(size, fingerprint, entry)| {
+            (*size, *fingerprint, entry.created)
+        });
 
-                for file_entry in &file_entries[1..] {
-                    if Self::are_files_identical(&base_file.path, &file_entry.path)? {
-                        identical_files.push(file_entry.clone());
-                    }
-                }
+        let mut duplicates = Vec::new();
 
-                if identical_files.len() > 1 {
-                    // Sort by creation time (oldest first)
-                    identical_files.sort_by_key(|e| {
-                        std::fs::metadata(&e.path)
-                            .ok()
-                            .and_then(|m| m.created().ok())
-                            .unwrap_or_else(std::time::SystemTime::now)
-                    });
-
-                    if self.verbose {
-                        println!(
-                            "[!] Found duplicates: Keeping {}",
-                            identical_files[0].path.display()
-                        );
-                        for entry in &identical_files[1..] {
-                            println!("[!]   - Will move: {}", entry.path.display());
-                        }
+        for run in by_fingerprint.chunk_by(|a, b| (a.0, a.1) == (b.0, b.1)) {
+            if run.len() > 1 {
+                let fingerprint = run[0].1;
+                let identical_files: Vec<FileEntry> =
+                    run.iter().map(|(_, _, entry)| (*entry).clone()).collect();
+
+                if self.verbose {
+                    println!(
+                        "[!] Found duplicates: Keeping {}",
+                        identical_files[0].path.display()
+                    );
+                    for entry in &identical_files[1..] {
+                        println!("[!]   - Will move: {}", entry.path.display());
                     }
-
-                    duplicates.push(DuplicateGroup {
-                        checksum_key,
-                        files: identical_files,
-                    });
                 }
+
+                duplicates.push(DuplicateGroup {
+                    checksum_key: format!("{:032x}", fingerprint),
+                    files: identical_files,
+                });
             }
         }
 
         Ok(duplicates)
     }
+
+    fn report_read_error(&self, entry: &FileEntry, e: &anyhow::Error) {
+        if self.verbose {
+            eprintln!("[-] Error reading file {}: {}", entry.path.display(), e);
+        }
+    }
+}
+
+/// Applies `f` to every item on scoped worker threads, preserving input order.
+/// Workers pull indices from a shared counter so one large file does not stall a whole batch.
+fn parallel_map<T, R, F>(items: &[T], f: F) -> Vec<R>
+where
+    T: Sync,
+    R: Send,
+    F: Fn(&T) -> R + Sync,
+{
+    let workers = thread::available_parallelism()
+        .map(|n| n.get())
+        .unwrap_or(1)
+        .min(items.len());
+
+    if workers <= 1 {
+        return items.iter().map(f).collect();
+    }
+
+    let next = AtomicUsize::new(0);
+    let mut results: Vec<(usize, R)> = thread::scope(|scope| {
+        let handles: Vec<_> = (0..workers)
+            .map(|_| {
+                scope.spawn(|| {
+                    let mut done = Vec::new();
+                    loop {
+                        let index = next.fetch_add(1, Ordering::Relaxed);
+                        if index >= items.len() {
+                            break;
+                        }
+                        done.push((index, f(&items[index])));
+                    }
+                    done
+                })
+            })
+            .collect();
+
+        handles
+            .into_iter()
+            .flat_map(|handle| handle.join().expect("hashing worker panicked"))
+            .collect()
+    });
+
+    results.sort_unstable_by_key(|(index, _)| *index);
+    results.into_iter().map(|(_, result)| result).collect()
 }
 
 #[cfg(test)]
@@ -173,6 +295,49 @@ mod tests {
         Ok(())
     }
 
+    #[test]
+    fn test_large_files_differing_at_end() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let file1 = temp_dir.path().join("file1.bin");
+        let file2 = temp_dir.path().join("file2.bin");
+
+        let content = vec![9u8; 2 * STREAM_BUFFER_BYTES];
+        let mut changed = content.clone();
+        *changed.last_mut().unwrap() = 0;
+
+        File::create(&file1)?.write_all(&content)?;
+        File::create(&file2)?.write_all(&changed)?;
+
+        assert!(!DuplicateFinder::are_files_identical(&file1, &file2)?);
+
+        // A difference in the second buffer-sized chunk is caught as well
+        let mut changed_middle = content.clone();
+        changed_middle[STREAM_BUFFER_BYTES + 1] = 0;
+        File::create(&file2)?.write_all(&changed_middle)?;
+
+        assert!(!DuplicateFinder::are_files_identical(&file1, &file2)?);
+
+        File::create(&file2)?.write_all(&content)?;
+        assert!(DuplicateFinder::are_files_identical(&file1, &file2)?);
+
+        Ok(())
+    }
+
+    #[cfg(unix)]
+    #[test]
+    fn test_hard_link_identical() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let file1 = temp_dir.path().join("file1.txt");
+        let file2 = temp_dir.path().join("file2.txt");
+
+        File::create(&file1)?.write_all(b"linked content")?;
+        std::fs::hard_link(&file1, &file2)?;
+
+        assert!(DuplicateFinder::are_files_identical(&file1, &file2)?);
+
+        Ok(())
+    }
+
     #[test]
     fn test_find_duplicates() -> Result<()> {
         let temp_dir = TempDir::new()?;
@@ -186,14 +351,8 @@ mod tests {
         f2.write_all(b"duplicate content")?;
 
         let entries = vec![
-            FileEntry {
-                path: file1,
-                category: crate::types::FileCategory::Documents,
-            },
-            FileEntry {
-                path: file2,
-                category: crate::types::FileCategory::Documents,
-            },
+            FileEntry::from_path(file1, crate::types::FileCategory::Documents)?,
+            FileEntry::from_path(file2, crate::types::FileCategory::Documents)?,
         ];
 
         let finder = DuplicateFinder::new(false);
@@ -218,14 +377,8 @@ mod tests {
         f2.write_all(b"content2")?;
 
         let entries = vec![
-            FileEntry {
-                path: file1,
-                category: crate::types::FileCategory::Documents,
-            },
-            FileEntry {
-                path: file2,
-                category: crate::types::FileCategory::Documents,
-            },
+            FileEntry::from_path(file1, crate::types::FileCategory::Documents)?,
+            FileEntry::from_path(file2, crate::types::FileCategory::Documents)?,
         ];
 
         let finder = DuplicateFinder::new(false);
@@ -262,26 +415,11 @@ mod tests {
         f5.write_all(b"unique")?;
 
         let entries = vec![
-            FileEntry {
-                path: file1,
-                category: crate::types::FileCategory::Documents,
-            },
-            FileEntry {
-                path: file2,
-                category: crate::types::FileCategory::Documents,
-            },
-            FileEntry {
-                path: file3,
-                category: crate::types::FileCategory::Documents,
-            },
-            FileEntry {
-                path: file4,
-                category: crate::types::FileCategory::Documents,
-            },
-            FileEntry {
-                path: file5,
-                category: crate::types::FileCategory::Documents,
-            },
+            FileEntry::from_path(file1, crate::types::FileCategory::Documents)?,
+            FileEntry::from_path(file2, crate::types::FileCategory::Documents)?,
+            FileEntry::from_path(file3, crate::types::FileCategory::Documents)?,
+            FileEntry::from_path(file4, crate::types::FileCategory::Documents)?,
+            FileEntry::from_path(file5, crate::types::FileCategory::Documents)?,
         ];
 
         let finder = DuplicateFinder::new(false);
@@ -304,14 +442,8 @@ mod tests {
         File::create(&file2)?;
 
         let entries = vec![
-            FileEntry {
-                path: file1,
-                category: crate::types::FileCategory::Documents,
-            },
-            FileEntry {
-                path: file2,
-                category: crate::types::FileCategory::Documents,
-            },
+            FileEntry::from_path(file1, crate::types::FileCategory::Documents)?,
+            FileEntry::from_path(file2, crate::types::FileCategory::Documents)?,
         ];
 
         let finder = DuplicateFinder::new(false);
@@ -336,14 +468,100 @@ mod tests {
         f2.write_all(b"this is a much longer content")?;
 
         let entries = vec![
-            FileEntry {
-                path: file1,
-                category: crate::types::FileCategory::Documents,
-            },
-            FileEntry {
-                path: file2,
-                category: crate::types::FileCategory::Documents,
-            },
+            FileEntry::from_path(file1, crate::types::FileCategory::Documents)?,
+            FileEntry::from_path(file2, crate::types::FileCategory::Documents)?,
+        ];
+
+        let finder = DuplicateFinder::new(false);
+        let duplicates = finder.find_duplicates(&entries)?;
+
+        assert_eq!(duplicates.len(), 0);
+
+        Ok(())
+    }
+
+    #[test]
+    fn test_same_size_same_head_not_duplicates() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let file1 = temp_dir.path().join("file1.txt");
+        let file2 = temp_dir.path().join("file2.txt");
+
+        // Identical first page, differing only past the head fingerprint window
+        let mut content1 = vec![7u8; 3 * HEAD_BYTES as usize];
+        let mut content2 = content1.clone();
+        content1.push(1);
+        content2.push(2);
+
+        let mut f1 = File::create(&file1)?;
+        f1.write_all(&content1)?;
+
+        let mut f2 = File::create(&file2)?;
+        f2.write_all(&content2)?;
+
+        let entries = vec![
+            FileEntry::from_path(file1, crate::types::FileCategory::Documents)?,
+            FileEntry::from_path(file2, crate::types::FileCategory::Documents)?,
+        ];
+
+        let finder = DuplicateFinder::new(false);
+        let duplicates = finder.find_duplicates(&entries)?;
+
+        assert_eq!(duplicates.len(), 0);
+
+        Ok(())
+    }
+
+    #[test]
+    fn test_large_file_fingerprint_matches_one_shot() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let file1 = temp_dir.path().join("large.bin");
+
+        let content: Vec<u8> = (0..2 * ONE_SHOT_BYTES + 3).map(|i| (i % 251) as u8).collect();
+        let mut f1 = File::create(&file1)?;
+        f1.write_all(&content)?;
+
+        assert_eq!(DuplicateFinder::calculate_fingerprint(&file1)?, xxh3_128(&content));
+
+        Ok(())
+    }
+
+    #[test]
+    fn test_small_file_head_is_full_fingerprint() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let file1 = temp_dir.path().join("file1.txt");
+
+        let mut f1 = File::create(&file1)?;
+        f1.write_all(b"fits in the head")?;
+
+        assert_eq!(
+            DuplicateFinder::calculate_head_fingerprint(&file1, 16)?,
+            DuplicateFinder::calculate_fingerprint(&file1)?
+        );
+
+        Ok(())
+    }
+
+    #[test]
+    fn test_parallel_map_preserves_order() {
+        let items: Vec<u64> = (0..100).collect();
+        let doubled = parallel_map(&items, |n| n * 2);
+        assert_eq!(doubled, (0..100).map(|n| n * 2).collect::<Vec<_>>());
+    }
+
+    #[test]
+    fn test_unreadable_entry_not_duplicate_of_empty_file() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let file1 = temp_dir.path().join("empty.txt");
+        let file2 = temp_dir.path().join("content.txt");
+
+        File::create(&file1)?;
+        let mut f2 = File::create(&file2)?;
+        f2.write_all(b"not empty")?;
+
+        // An entry whose metadata could not be read is recorded with size 0
+        let entries = vec![
+            FileEntry::from_path(file1, crate::types::FileCategory::Documents)?,
+            FileEntry::unreadable(file2, crate::types::FileCategory::Documents),
         ];
 
         let finder = DuplicateFinder::new(false);
@@ -362,10 +580,7 @@ mod tests {
         let mut f1 = File::create(&file1)?;
         f1.write_all(b"unique content")?;
 
-        let entries = vec![FileEntry {
-            path: file1,
-            category: crate::types::FileCategory::Documents,
-        }];
+        let entries = vec![FileEntry::from_path(file1, crate::types::FileCategory::Documents)?];
 
         let finder = DuplicateFinder::new(false);
         let duplicates = finder.find_duplicates(&entries)?;
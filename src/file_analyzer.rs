@@ -18,22 +18,29 @@ impl FileAnalyzer {
     }
 
     fn get_extension_category(ext: &str) -> Option<FileCategory> {
-        match ext.to_lowercase().as_str() {
+        // Every supported extension is at most 4 bytes, so lowercase into a stack
+        // buffer rather than allocating a String for each scanned file
+        let mut buffer = [0u8; 4];
+        let lower = buffer.get_mut(..ext.len())?;
+        lower.copy_from_slice(ext.as_bytes());
+        lower.make_ascii_lowercase();
+
+        match &*lower {
             // Office Documents
-            "ppt" | "pptx" => Some(FileCategory::Presentations),
-            "doc" | "docx" => Some(FileCategory::Documents),
-            "xls" | "xlsx" => Some(FileCategory::Spreadsheets),
+            b"ppt" | b"pptx" => Some(FileCategory::Presentations),
+            b"doc" | b"docx" => Some(FileCategory::Documents),
+            b"xls" | b"xlsx" => Some(FileCategory::Spreadsheets),
             // PDFs
-            "pdf" => Some(FileCategory::PDFs),
+            b"pdf" => Some(FileCategory::PDFs),
             // Images
-            "jpg" | "jpeg" | "png" | "gif" | "bmp" | "tiff" | "webp" | "heic" | "raw"
-            | "cr2" | "nef" | "arw" => Some(FileCategory::Images),
+            b"jpg" | b"jpeg" | b"png" | b"gif" | b"bmp" | b"tiff" | b"webp" | b"heic" | b"raw"
+            | b"cr2" | b"nef" | b"arw" => Some(FileCategory::Images),
             // Videos
-            "mp4" | "mov" | "avi" | "mkv" | "wmv" | "flv" | "webm" | "m4v" | "3gp" => {
+            b"mp4" | b"mov" | b"avi" | b"mkv" | b"wmv" | b"flv" | b"webm" | b"m4v" | b"3gp" => {
                 Some(FileCategory::Videos)
             }
             // Audio
-            "mp3" | "wav" | "aac" | "ogg" | "flac" | "m4a" | "wma" | "aiff" => {
+            b"mp3" | b"wav" | b"aac" | b"ogg" | b"flac" | b"m4a" | b"wma" | b"aiff" => {
                 Some(FileCategory::Audio)
             }
             _ => None,
@@ -55,8 +62,13 @@ impl FileAnalyzer {
             let entry = entry?;
             let path = entry.path();
 
+            // The file type comes from the directory listing itself, so only
+            // symlinks need an extra stat to find out what they point at
+            let file_type = entry.file_type()?;
+            let is_dir = file_type.is_dir() || (file_type.is_symlink() && path.is_dir());
+
             // Skip directories and Duplicates folder
-            if path.is_dir() || path == duplicates_dir {
+            if is_dir || path == duplicates_dir {
                 if self.verbose {
                     println!("[~] Skipping folder: {}", path.display());
                 }
@@ -67,6 +79,12 @@ impl FileAnalyzer {
 
             if let Some(ext) = path.extension().and_then(|e| e.to_str()) {
                 if let Some(category) = Self::get_extension_category(ext) {
+                    let metadata = if file_type.is_symlink() {
+                        fs::metadata(&path)
+                    } else {
+                        entry.metadata()
+                    };
+
                     supported_files += 1;
                     if self.verbose {
                         println!(
@@ -75,10 +93,18 @@ impl FileAnalyzer {
                             path.file_name().unwrap_or_default().to_string_lossy()
                         );
                     }
-                    categories.entry(category.clone()).or_insert_with(Vec::new).push(FileEntry {
-                        path,
-                        category,
-                    });
+                    categories
+                        .entry(category.clone())
+                        .or_insert_with(Vec::new)
+                        .push(match metadata {
+                            Ok(metadata) => FileEntry::new(path, category, &metadata),
+                            Err(e) => {
+                                if self.verbose {
+                                    eprintln!("[-] Error reading file {}: {}", path.display(), e);
+                                }
+                                FileEntry::unreadable(path, category)
+                            }
+                        });
                 }
             }
         }
@@ -123,6 +149,7 @@ mod tests {
             Some(FileCategory::Videos)
         );
         assert_eq!(FileAnalyzer::get_extension_category("unknown"), None);
+        assert_eq!(FileAnalyzer::get_extension_category(""), None);
     }
 
     #[test]
@@ -279,4 +306,24 @@ mod tests {
 
         Ok(())
     }
+
+    #[cfg(unix)]
+    #[test]
+    fn test_analyze_keeps_broken_symlink() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let link = temp_dir.path().join("missing.pdf");
+        std::os::unix::fs::symlink(temp_dir.path().join("gone.pdf"), &link)?;
+
+        let analyzer = FileAnalyzer::new(temp_dir.path().to_path_buf(), false);
+        let result = analyzer.analyze()?;
+
+        // Metadata cannot be read, but the file is still counted and categorized
+        assert_eq!(result.total_files, 1);
+        assert_eq!(result.supported_files, 1);
+        let pdfs = &result.categories[&FileCategory::PDFs];
+        assert_eq!(pdfs.len(), 1);
+        assert_eq!(pdfs[0].size, 0);
+
+        Ok(())
+    }
 }
@@ -32,11 +32,11 @@ fn main() -> anyhow::Result<()> {
     let analyzer = FileAnalyzer::new(args.folder_path.clone(), args.verbose);
     let analysis = analyzer.analyze()?;
 
-    // Collect all entries
-    let mut all_entries = Vec::new();
-    for entries in analysis.categories.values() {
-        all_entries.extend(entries.clone());
-    }
+    // Category names are 'static, so take them before the entries are moved out
+    let categories: Vec<&str> = analysis.categories.keys().map(|c| c.as_str()).collect();
+
+    // Collect all entries, moving them out of the analysis instead of cloning a second copy
+    let all_entries: Vec<_> = analysis.categories.into_values().flatten().collect();
 
     // Find duplicates
     let finder = DuplicateFinder::new(args.verbose);
@@ -47,11 +47,6 @@ fn main() -> anyhow::Result<()> {
 
     if !args.analyze {
         // Create category folders
-        let categories: Vec<&str> = analysis
-            .categories
-            .keys()
-            .map(|c| c.as_str())
-            .collect();
         organizer.create_category_folders(&categories)?;
     }
 
@@ -64,7 +59,6 @@ fn main() -> anyhow::Result<()> {
         &summary.duplicates_found,
         &summary.actions_taken,
         args.analyze,
-        &args.folder_path,
     );
 
     Ok(())
@@ -1,12 +1,23 @@
 use crate::types::{DuplicateGroup, FileEntry, OrganizationSummary};
 use anyhow::Result;
+use once_cell::sync::Lazy;
 use regex::Regex;
+use std::cell::RefCell;
+use std::collections::{HashMap, HashSet};
+use std::ffi::{OsStr, OsString};
 use std::fs;
 use std::path::{Path, PathBuf};
 
+// Matches old-style numbering like "_1", "_2", etc. at the end of a file stem
+static TRAILING_NUMBER: Lazy<Regex> = Lazy::new(|| Regex::new(r"_\d+$").unwrap());
+
 pub struct Organizer {
     folder_path: PathBuf,
     verbose: bool,
+    // Names taken in each destination folder, listed once and updated as paths are handed out
+    dest_listing: RefCell<HashMap<PathBuf, HashSet<OsString>>>,
+    // Directories known to exist, so moves into them skip create_dir_all
+    created_dirs: RefCell<HashSet<PathBuf>>,
 }
 
 impl Organizer {
@@ -14,21 +25,43 @@ impl Organizer {
         Self {
             folder_path: folder_path.canonicalize().unwrap_or(folder_path),
             verbose,
+            dest_listing: RefCell::new(HashMap::new()),
+            created_dirs: RefCell::new(HashSet::new()),
+        }
+    }
+
+    // Case-insensitive filesystems treat "a.pdf" and "A.pdf" as the same entry
+    fn name_key(name: &OsStr) -> OsString {
+        if cfg!(any(target_os = "macos", target_os = "windows")) {
+            name.to_string_lossy().to_lowercase().into()
+        } else {
+            name.to_os_string()
         }
     }
 
+    fn list_names(folder: &Path) -> HashSet<OsString> {
+        fs::read_dir(folder)
+            .map(|entries| {
+                entries
+                    .filter_map(|entry| entry.ok())
+                    .map(|entry| Self::name_key(&entry.file_name()))
+                    .collect()
+            })
+            .unwrap_or_default()
+    }
+
     fn clean_filename(&self, filepath: &Path) -> PathBuf {
         if let Some(file_name) = filepath.file_name().and_then(|n| n.to_str()) {
             if let Some(stem_start) = file_name.rfind('.') {
                 let stem = &file_name[..stem_start];
                 let ext = &file_name[stem_start..];
 
-                // Match patterns like "_1", "_2", etc. at the end of the filename
-                if let Ok(re) = Regex::new(r"_\d+$") {
-                    if re.is_match(stem) {
-                        let clean_stem = re.replace(stem, "").to_string();
-                        return filepath.parent().unwrap().join(format!("{}{}", clean_stem, ext));
-                    }
+                // Most names have no underscore at all, so skip the regex for them
+                if stem.contains('_')
+                    && let Some(m) = TRAILING_NUMBER.find(stem)
+                {
+                    let clean_stem = &stem[..m.start()];
+                    return filepath.parent().unwrap().join(format!("{}{}", clean_stem, ext));
                 }
             }
         }
@@ -37,47 +70,159 @@ impl Organizer {
 
     fn get_unique_path(&self, target_path: &Path) -> PathBuf {
         let target_path = self.clean_filename(target_path);
+        let parent = target_path.parent().unwrap();
 
-        if !target_path.exists() {
-            return target_path;
-        }
+        let mut listings = self.dest_listing.borrow_mut();
+        let taken = listings
+            .entry(parent.to_path_buf())
+            .or_insert_with(|| Self::list_names(parent));
 
-        let mut counter = 1;
+        let stem = target_path.file_stem().unwrap_or_default().to_string_lossy();
+        let ext = target_path.extension().unwrap_or_default().to_string_lossy();
+        let mut candidate = target_path.clone();
+        let mut counter = 0;
         loop {
-            let stem = target_path.file_stem().unwrap_or_default().to_string_lossy();
-            let ext = target_path.extension().unwrap_or_default().to_string_lossy();
+            // HashSet::insert doubles as the reservation, so later calls see this name as taken.
+            // The listing can miss names the filesystem considers equal (case folding, Unicode
+            // normalization) or files created since it was read, and rename would replace
+            // them, so the pick is confirmed with one stat before it is handed out.
+            if taken.insert(Self::name_key(candidate.file_name().unwrap_or_default()))
+                && fs::symlink_metadata(&candidate).is_err()
+            {
+                return candidate;
+            }
+
+            counter += 1;
             let new_name = format!("{} ({}){}", stem, counter, if ext.is_empty() { String::new() } else { format!(".{}", ext) });
-            let new_path = target_path.parent().unwrap().join(new_name);
+            candidate = parent.join(new_name);
+        }
+    }
 
-            if !new_path.exists() {
-                return new_path;
+    fn release_name(&self, path: &Path) {
+        if let (Some(parent), Some(name)) = (path.parent(), path.file_name())
+            && let Some(taken) = self.dest_listing.borrow_mut().get_mut(parent)
+        {
+            taken.remove(&Self::name_key(name));
+        }
+    }
+
+    // Moves to a path handed out by get_unique_path, giving the name back if the move fails
+    fn move_to_reserved(&self, source: &Path, dest: &Path) -> Result<bool> {
+        let result = self.safe_move(source, dest);
+        if let Err(e) = &result {
+            self.release_name(dest);
+            if self.verbose {
+                eprintln!("[-] Error moving file {}: {}", source.display(), e);
             }
-            counter += 1;
         }
+        result
     }
 
     fn safe_move(&self, source: &Path, dest: &Path) -> Result<bool> {
-        let source = source.canonicalize()?;
-        let dest = dest.canonicalize().unwrap_or_else(|_| dest.to_path_buf());
-
         // Create parent directory if it doesn't exist
         if let Some(parent) = dest.parent() {
-            fs::create_dir_all(parent)?;
+            self.ensure_dir(parent)?;
         }
 
-        fs::rename(&source, &dest)?;
+        // A rename is a single syscall and covers the usual same-filesystem case
+        match fs::rename(source, dest) {
+            Ok(()) => {}
+            Err(e) if e.kind() == std::io::ErrorKind::CrossesDevices => {
+                Self::move_across_devices(source, dest)?;
+            }
+            Err(e) => return Err(e.into()),
+        }
         Ok(true)
     }
 
+    // rename cannot cross filesystems, so recreate the entry at dest and then remove source
+    fn move_across_devices(source: &Path, dest: &Path) -> Result<()> {
+        let metadata = fs::symlink_metadata(source)?;
+
+        if metadata.file_type().is_symlink() {
+            // Move the link itself, as rename would, rather than copying its target
+            Self::create_symlink(&fs::read_link(source)?, dest)?;
+        } else {
+            let mut reader = fs::File::open(source)?;
+            // create_new refuses to replace an existing file, so anything removed
+            // below is guaranteed to be the copy made here
+            let mut writer = fs::OpenOptions::new().write(true).create_new(true).open(dest)?;
+
+            let copied = std::io::copy(&mut reader, &mut writer)
+                .and_then(|_| Self::copy_times(&metadata, &writer))
+                .and_then(|_| writer.set_permissions(metadata.permissions()));
+            if let Err(e) = copied {
+                drop(writer);
+                let _ = fs::remove_file(dest);
+                return Err(e.into());
+            }
+        }
+
+        // Never leave the file in both places
+        if let Err(e) = fs::remove_file(source) {
+            let _ = fs::remove_file(dest);
+            return Err(e.into());
+        }
+        Ok(())
+    }
+
+    // Carries access and modification times over to the copy. Creation time can only be
+    // set on macOS and Windows; on Linux the copy gets a new one.
+    fn copy_times(metadata: &fs::Metadata, dest: &fs::File) -> std::io::Result<()> {
+        let times = fs::FileTimes::new()
+            .set_accessed(metadata.accessed()?)
+            .set_modified(metadata.modified()?);
+
+        #[cfg(target_os = "macos")]
+        let times = {
+            use std::os::macos::fs::FileTimesExt;
+            match metadata.created() {
+                Ok(created) => times.set_created(created),
+                Err(_) => times,
+            }
+        };
+        #[cfg(windows)]
+        let times = {
+            use std::os::windows::fs::FileTimesExt;
+            match metadata.created() {
+                Ok(created) => times.set_created(created),
+                Err(_) => times,
+            }
+        };
+
+        dest.set_times(times)
+    }
+
+    #[cfg(unix)]
+    fn create_symlink(target: &Path, link: &Path) -> std::io::Result<()> {
+        std::os::unix::fs::symlink(target, link)
+    }
+
+    #[cfg(windows)]
+    fn create_symlink(target: &Path, link: &Path) -> std::io::Result<()> {
+        std::os::windows::fs::symlink_file(target, link)
+    }
+
+    fn ensure_dir(&self, dir: &Path) -> Result<()> {
+        if !self.created_dirs.borrow().contains(dir) {
+            fs::create_dir_all(dir)?;
+            self.created_dirs.borrow_mut().insert(dir.to_path_buf());
+        }
+        Ok(())
+    }
+
     pub fn create_category_folders(&self, categories: &[&str]) -> Result<Vec<String>> {
         let mut actions = Vec::new();
 
         for category in categories {
             let category_folder = self.folder_path.join(category);
-            if !category_folder.exists() {
-                fs::create_dir_all(&category_folder)?;
-                actions.push(format!("Created category folder: {}", category));
+            // Attempt the mkdir directly rather than stat first, an existing folder is not an error
+            match fs::create_dir(&category_folder) {
+                Ok(()) => actions.push(format!("Created category folder: {}", category)),
+                Err(e) if e.kind() == std::io::ErrorKind::AlreadyExists => {}
+                Err(e) => return Err(e.into()),
             }
+            self.created_dirs.borrow_mut().insert(category_folder);
         }
 
         Ok(actions)
@@ -91,17 +236,18 @@ impl Organizer {
     ) -> Result<OrganizationSummary> {
         let mut actions_taken = Vec::new();
 
-        // Create a set of files to skip (duplicates that will be moved)
-        let mut files_to_skip = std::collections::HashSet::new();
+        // Create a set of files to skip (duplicates that will be moved). Keys borrow the raw
+        // path bytes, which hash directly instead of component by component like a Path.
+        let mut files_to_skip: HashSet<&OsStr> = HashSet::new();
         for dup_group in duplicates {
             for entry in &dup_group.files[1..] {
-                files_to_skip.insert(entry.path.clone());
+                files_to_skip.insert(entry.path.as_os_str());
             }
         }
 
         // Move files to category folders
         for entry in entries {
-            if files_to_skip.contains(&entry.path) {
+            if files_to_skip.contains(entry.path.as_os_str()) {
                 continue;
             }
 
@@ -110,7 +256,7 @@ impl Organizer {
                 let new_path = self.get_unique_path(&category_folder.join(entry.path.file_name().unwrap()));
 
                 if !dry_run {
-                    if let Ok(true) = self.safe_move(&entry.path, &new_path) {
+                    if let Ok(true) = self.move_to_reserved(&entry.path, &new_path) {
                         actions_taken.push(format!(
                             "Moved {} to {} folder",
                             entry.path.file_name().unwrap_or_default().to_string_lossy(),
@@ -131,7 +277,7 @@ impl Organizer {
         if !duplicates.is_empty() {
             let dup_folder = self.folder_path.join("Duplicates");
             if !dry_run {
-                fs::create_dir_all(&dup_folder)?;
+                self.ensure_dir(&dup_folder)?;
             }
 
             for dup_group in duplicates {
@@ -140,7 +286,7 @@ impl Organizer {
                         let new_path = self.get_unique_path(&dup_folder.join(entry.path.file_name().unwrap()));
 
                         if !dry_run {
-                            if let Ok(true) = self.safe_move(&entry.path, &new_path) {
+                            if let Ok(true) = self.move_to_reserved(&entry.path, &new_path) {
                                 let original = &dup_group.files[0];
                                 actions_taken.push(format!(
                                     "Moved duplicate {} to Duplicates folder (identical to {})",
@@ -172,6 +318,7 @@ impl Organizer {
 mod tests {
     use super::*;
     use std::fs::File;
+    use std::io::Write;
     use tempfile::TempDir;
 
     #[test]
@@ -223,6 +370,121 @@ mod tests {
         Ok(())
     }
 
+    #[test]
+    fn test_get_unique_path_reserves_names() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let organizer = Organizer::new(temp_dir.path().to_path_buf(), false);
+
+        let target = temp_dir.path().join("test.txt");
+        let first = organizer.get_unique_path(&target);
+        let second = organizer.get_unique_path(&target);
+
+        // Nothing exists on disk, but the first call already claimed the name
+        assert_eq!(first.file_name().unwrap(), "test.txt");
+        assert_eq!(second.file_name().unwrap(), "test (1).txt");
+
+        Ok(())
+    }
+
+    #[test]
+    fn test_failed_move_releases_name() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let missing = temp_dir.path().join("doc_1.docx");
+        let present = temp_dir.path().join("doc.docx");
+        File::create(&present)?;
+
+        // Both clean to Documents/doc.docx; the first cannot move because it does not exist
+        let entries = vec![
+            FileEntry::unreadable(missing, crate::types::FileCategory::Documents),
+            FileEntry::from_path(present, crate::types::FileCategory::Documents)?,
+        ];
+
+        let organizer = Organizer::new(temp_dir.path().to_path_buf(), false);
+        let summary = organizer.organize_files(&entries, &[], false)?;
+
+        assert_eq!(summary.actions_taken.len(), 1);
+        assert!(temp_dir.path().join("Documents").join("doc.docx").exists());
+        assert!(!temp_dir.path().join("Documents").join("doc (1).docx").exists());
+
+        Ok(())
+    }
+
+    #[test]
+    fn test_move_across_devices_keeps_timestamps() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let source = temp_dir.path().join("old.pdf");
+        let dest = temp_dir.path().join("moved.pdf");
+        File::create(&source)?.write_all(b"content")?;
+
+        let modified = std::time::SystemTime::UNIX_EPOCH + std::time::Duration::from_secs(1_000_000_000);
+        File::open(&source)?.set_modified(modified)?;
+
+        Organizer::move_across_devices(&source, &dest)?;
+
+        assert!(!source.exists());
+        assert_eq!(fs::read(&dest)?, b"content");
+        assert_eq!(fs::metadata(&dest)?.modified()?, modified);
+
+        Ok(())
+    }
+
+    #[test]
+    fn test_move_across_devices_never_replaces_dest() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let source = temp_dir.path().join("new.pdf");
+        let dest = temp_dir.path().join("existing.pdf");
+        File::create(&source)?.write_all(b"new")?;
+        File::create(&dest)?.write_all(b"existing")?;
+
+        assert!(Organizer::move_across_devices(&source, &dest).is_err());
+        assert_eq!(fs::read(&source)?, b"new");
+        assert_eq!(fs::read(&dest)?, b"existing");
+
+        // A source that cannot be opened must not touch the destination either
+        let missing = temp_dir.path().join("missing.pdf");
+        assert!(Organizer::move_across_devices(&missing, &dest).is_err());
+        assert_eq!(fs::read(&dest)?, b"existing");
+
+        Ok(())
+    }
+
+    #[cfg(unix)]
+    #[test]
+    fn test_move_across_devices_recreates_symlink() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let target = temp_dir.path().join("target.pdf");
+        let source = temp_dir.path().join("link.pdf");
+        let dest = temp_dir.path().join("moved.pdf");
+        File::create(&target)?.write_all(b"content")?;
+        std::os::unix::fs::symlink(&target, &source)?;
+
+        Organizer::move_across_devices(&source, &dest)?;
+
+        assert!(fs::symlink_metadata(&source).is_err());
+        assert!(fs::symlink_metadata(&dest)?.file_type().is_symlink());
+        assert_eq!(fs::read_link(&dest)?, target);
+
+        Ok(())
+    }
+
+    #[test]
+    fn test_get_unique_path_never_returns_existing_file() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let organizer = Organizer::new(temp_dir.path().to_path_buf(), false);
+
+        // Cache the listing while the folder is empty, then create a file it does not know about,
+        // standing in for a name the filesystem treats as equal but name_key does not
+        let target = temp_dir.path().join("report.pdf");
+        organizer.get_unique_path(&temp_dir.path().join("other.pdf"));
+        File::create(&target)?.write_all(b"keep me")?;
+
+        let unique_path = organizer.get_unique_path(&target);
+        assert_eq!(unique_path.file_name().unwrap(), "report (1).pdf");
+        assert_eq!(fs::read(&target)?, b"keep me");
+
+        Ok(())
+    }
+
     #[test]
     fn test_clean_filename_with_multiple_numbers() -> Result<()> {
         let temp_dir = TempDir::new()?;
@@ -287,10 +549,7 @@ mod tests {
         let file1 = temp_dir.path().join("doc.docx");
         File::create(&file1)?;
 
-        let entry = FileEntry {
-            path: file1.clone(),
-            category: crate::types::FileCategory::Documents,
-        };
+        let entry = FileEntry::from_path(file1.clone(), crate::types::FileCategory::Documents)?;
 
         let organizer = Organizer::new(temp_dir.path().to_path_buf(), false);
         let summary = organizer.organize_files(&[entry], &[], true)?;
@@ -310,10 +569,7 @@ mod tests {
         let file1 = temp_dir.path().join("doc.docx");
         File::create(&file1)?;
 
-        let entry = FileEntry {
-            path: file1.clone(),
-            category: crate::types::FileCategory::Documents,
-        };
+        let entry = FileEntry::from_path(file1.clone(), crate::types::FileCategory::Documents)?;
 
         let organizer = Organizer::new(temp_dir.path().to_path_buf(), false);
         fs::create_dir(temp_dir.path().join("Documents"))?;
@@ -336,14 +592,8 @@ mod tests {
         File::create(&file1)?;
         File::create(&file2)?;
 
-        let entry1 = FileEntry {
-            path: file1.clone(),
-            category: crate::types::FileCategory::Documents,
-        };
-        let entry2 = FileEntry {
-            path: file2.clone(),
-            category: crate::types::FileCategory::Documents,
-        };
+        let entry1 = FileEntry::from_path(file1.clone(), crate::types::FileCategory::Documents)?;
+        let entry2 = FileEntry::from_path(file2.clone(), crate::types::FileCategory::Documents)?;
 
         let dup_group = crate::types::DuplicateGroup {
             checksum_key: "test_key".to_string(),
@@ -1,5 +1,8 @@
 use std::collections::HashMap;
+use std::fs::{self, Metadata};
+use std::io;
 use std::path::PathBuf;
+use std::time::SystemTime;
 
 #[derive(Debug, Clone, PartialEq, Eq, Hash)]
 pub enum FileCategory {
@@ -54,6 +57,37 @@ impl FileCategory {
 pub struct FileEntry {
     pub path: PathBuf,
     pub category: FileCategory,
+    pub size: u64,
+    pub created: SystemTime,
+}
+
+impl FileEntry {
+    /// Builds an entry from metadata the caller already has, avoiding another stat call
+    pub fn new(path: PathBuf, category: FileCategory, metadata: &Metadata) -> Self {
+        Self {
+            path,
+            category,
+            size: metadata.len(),
+            created: metadata.created().unwrap_or_else(|_| SystemTime::now()),
+        }
+    }
+
+    /// Entry for a file whose metadata could not be read, such as a broken symlink.
+    /// It is still organized, and duplicate detection rejects it when its contents
+    /// do not match the zero size recorded here.
+    pub fn unreadable(path: PathBuf, category: FileCategory) -> Self {
+        Self {
+            path,
+            category,
+            size: 0,
+            created: SystemTime::now(),
+        }
+    }
+
+    pub fn from_path(path: PathBuf, category: FileCategory) -> io::Result<Self> {
+        let metadata = fs::metadata(&path)?;
+        Ok(Self::new(path, category, &metadata))
+    }
 }
 
 #[derive(Debug, Clone)]